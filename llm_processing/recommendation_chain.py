@@ -28,7 +28,9 @@ class RecommendationChain:
             "produce concise, human-friendly outfit suggestions or product recommendations. "
             "The average ratings are from 0 to 5 and represent Amazon review ratings, if the rating is over 3, mention that it is a well reviewed product on Amazon."
             "Similarity scores are internal metrics that represent how similar the product is to the user's query, only use this to decide which "
-            "product to mention first but do not display the score."
+            "product to mention first but do not display the score. "
+            "If products are tagged with an outfit slot (top, bottom, footwear, accessory), "
+            "compose a complete outfit by picking from each slot."
         )
         # User prompt template
         human_template = (
@@ -58,8 +60,9 @@ class RecommendationChain:
             desc = p.get('description', '')
             score = p.get('score', 0.0)
             rating = p.get('average_rating', 'N/A')
+            slot = f"[{p['slot']}] " if p.get('slot') else ""
             products_str.append(
-                f"- {title}: {desc} (score: {score:.2f}, rating: {rating})"
+                f"- {slot}{title}: {desc} (score: {score:.2f}, rating: {rating})"
             )
         formatted = "\n".join(products_str)
 
@@ -1,12 +1,84 @@
 import os
+import re
 import logging
+from functools import lru_cache
+import numpy as np
 from dotenv import load_dotenv
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from data_processing.preprocess import load_dataset, preprocess_text
 
 logger = logging.getLogger(__name__)
 
+# Outfit slots and the category keywords used to decide which slot a hit belongs to.
+# Keywords are matched as whole words with an optional plural ("s"/"es"), so "boot"
+# matches "Boots" but not "bootcut". Full-body pieces (dresses, jumpsuits) live in "top"
+# since they fill the same place in an outfit. "shorts", "flats" and "heels" are only
+# listed in plural to avoid "short sleeve", "flat brim" and similar descriptors.
+# Each product gets a single slot: the one whose keyword matches last in its text, since
+# titles put the noun after its modifiers ("Dress Shoes", "Top Handle Bag", "Cap Sleeve Blouse").
+OUTFIT_SLOTS = {
+    "top": ("top", "shirt", "blouse", "tee", "tank", "sweater", "hoodie", "cardigan", "jacket",
+            "coat", "vest", "dress", "jumpsuit", "romper"),
+    "bottom": ("bottom", "pants", "shorts", "skirt", "jeans", "leggings", "trousers", "capris", "joggers"),
+    "footwear": ("shoe", "sandal", "boot", "sneaker", "slipper", "loafer", "flats", "heels", "clog"),
+    "accessory": ("accessory", "accessories", "jewelry", "hat", "cap", "bag", "handbag", "satchel",
+                  "sunglasses", "watch", "belt", "scarf", "scarves", "necklace", "bracelet", "earring",
+                  "wallet"),
+}
+
+# Items that are not part of an outfit slot; when one of these is the last match
+# ("Men's Dress Socks") the product is left out instead of landing in "top".
+NON_OUTFIT_KEYWORDS = ("sock", "hosiery", "tights", "underwear", "bra", "lingerie", "pajama")
+
+# Categories come from the dataset's ' > ' joined category path, e.g.
+# "Clothing, Shoes & Jewelry > Women > Shoes > Sandals". This root is shared by most
+# products and would match every slot, so it is stripped before matching.
+CATEGORY_ROOT = "Clothing, Shoes & Jewelry"
+
+
+@lru_cache(maxsize=None)
+def _slot_pattern(keywords: tuple) -> re.Pattern:
+    """
+    Compile a whole-word, optionally pluralised pattern for a slot's keywords.
+    """
+    alternatives = "|".join(re.escape(k) for k in keywords)
+    return re.compile(rf"\b(?:{alternatives})(?:s|es)?\b", re.IGNORECASE)
+
+
+def mmr_select(query_vec: np.ndarray, candidate_vecs: np.ndarray, k: int, lambda_mult: float = 0.5) -> list[int]:
+    """
+    Maximal Marginal Relevance over a candidate matrix.
+    Similarities are computed once as cosine matrices; each greedy step only updates
+    a running "max similarity to selected" vector instead of re-scoring pairs.
+    Returns row indices into candidate_vecs in selection order.
+    """
+    n = candidate_vecs.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    # Normalize so inner products are cosine similarities
+    cands = candidate_vecs / np.maximum(np.linalg.norm(candidate_vecs, axis=1, keepdims=True), 1e-12)
+    query = query_vec / max(np.linalg.norm(query_vec), 1e-12)
+    relevance = cands @ query
+    pairwise = cands @ cands.T
+
+    selected = [int(np.argmax(relevance))]
+    max_sim = pairwise[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < k:
+        mmr_scores = lambda_mult * relevance - (1 - lambda_mult) * max_sim
+        mmr_scores[~available] = -np.inf
+        idx = int(np.argmax(mmr_scores))
+        selected.append(idx)
+        available[idx] = False
+        np.maximum(max_sim, pairwise[idx], out=max_sim)
+    return selected
+
 
 class SemanticSearchService:
     """
@@ -42,6 +114,7 @@ class SemanticSearchService:
                 'product_id': row['product_id'],
                 'title': row['title'],
                 'description': row['description'],
+                'categories': row.get('categories', None),
                 'average_rating': row.get('average_rating', None)
             })
 
@@ -76,7 +149,7 @@ class SemanticSearchService:
     def query(self, query_text: str, top_k: int = 5):
         """
         Run a semantic search against the loaded FAISS index.
-        Returns a list of dicts with product_id, title, description, and score.
+        Returns a list of dicts with product_id, title, description, categories, score and average_rating.
         """
         if self._vectorstore is None:
             raise RuntimeError("Vectorstore not initialized; call initialize() first")
@@ -92,12 +165,125 @@ class SemanticSearchService:
                 "product_id": md.get("product_id"),
                 "title": md.get("title"),
                 "description": md.get("description"),
+                "categories": md.get("categories"),
                 "score": float(score),
                 'average_rating': md.get('average_rating')
             })
         logger.debug("Semantic search returned %d results", len(results))
         return results
 
+    def query_outfit(self, query_text: str, top_k_per_slot: int = 3, fetch_k: int = 50,
+                     lambda_mult: float = 0.5, slots: dict = None):
+        """
+        Compose an outfit by expanding the query into one sub-query per slot.
+        All sub-queries are embedded in one batched call and searched together as a
+        single query matrix, then each slot is diversified with MMR on the candidate vectors.
+        Returns a dict of slot name -> list of result dicts (same keys as query()).
+        Slots with no candidate assigned to them are left empty.
+        """
+        if self._vectorstore is None:
+            raise RuntimeError("Vectorstore not initialized; call initialize() first")
+        # Querying the raw index mirrors similarity_search_with_score only for the default L2 index
+        if self._vectorstore.distance_strategy != DistanceStrategy.EUCLIDEAN_DISTANCE:
+            raise RuntimeError(
+                f"Outfit search requires an L2 index, got {self._vectorstore.distance_strategy}"
+            )
+        if slots is None:
+            slots = OUTFIT_SLOTS
+
+        slot_names = list(slots)
+        sub_queries = [f"{query_text} {slot}" for slot in slot_names]
+        logger.debug("Running outfit search for query=%r, slots=%s, fetch_k=%d", query_text, slot_names, fetch_k)
+
+        # 1. One embedding round-trip for every slot
+        query_vecs = np.array(self._embeddings.embed_documents(sub_queries), dtype=np.float32)
+        # FAISS exposes no public accessor for this; it is the same flag similarity_search_by_vector reads
+        if self._vectorstore._normalize_L2:
+            query_vecs /= np.maximum(np.linalg.norm(query_vecs, axis=1, keepdims=True), 1e-12)
+
+        # 2. One FAISS search for the whole query matrix.
+        # Scores are L2 distances (lower is better), like query(); MMR ranks on cosine instead.
+        index = self._vectorstore.index
+        scores, idxs = index.search(query_vecs, fetch_k)
+
+        # Reconstruct each unique candidate vector once, shared across slots
+        unique_ids = np.unique(idxs[idxs >= 0])
+        candidate_vecs = index.reconstruct_batch(unique_ids) if len(unique_ids) else np.empty((0, index.d))
+        row_of = {int(i): r for r, i in enumerate(unique_ids)}
+
+        # Look up each candidate's document and assign it a single slot up front
+        docs = {}
+        slot_of = {}
+        for i in row_of:
+            docs[i] = self._vectorstore.docstore.search(self._vectorstore.index_to_docstore_id[i])
+            slot_of[i] = self._assign_slot(docs[i].metadata, slots)
+
+        # 3. Per-slot filter + MMR, never reusing a product (duplicate rows share a product_id)
+        outfit = {}
+        used = set()
+        for s_idx, slot in enumerate(slot_names):
+            hits = []
+            seen = set()
+            for score, i in zip(scores[s_idx], idxs[s_idx]):
+                # FAISS pads with -1 when fetch_k exceeds the index size
+                if i < 0 or slot_of[int(i)] != slot:
+                    continue
+                doc = docs[int(i)]
+                product_id = doc.metadata.get("product_id")
+                if product_id in used or product_id in seen:
+                    continue
+                seen.add(product_id)
+                hits.append((int(i), float(score), doc))
+
+            rows = [row_of[i] for i, _, _ in hits]
+            picks = mmr_select(query_vecs[s_idx], candidate_vecs[rows], top_k_per_slot, lambda_mult) if rows else []
+
+            results = []
+            for p in picks:
+                _, score, doc = hits[p]
+                md = doc.metadata
+                used.add(md.get("product_id"))
+                results.append({
+                    "product_id": md.get("product_id"),
+                    "title": md.get("title"),
+                    "description": md.get("description"),
+                    "categories": md.get("categories"),
+                    "score": score,
+                    'average_rating': md.get('average_rating')
+                })
+            outfit[slot] = results
+
+        logger.debug("Outfit search returned %s", {slot: len(r) for slot, r in outfit.items()})
+        return outfit
+
+    @staticmethod
+    def _assign_slot(metadata: dict, slots: dict = None) -> str | None:
+        """
+        Pick the single slot for a product from its categories (or title, when categories are absent).
+        The slot whose keyword matches furthest into the text wins; None if nothing matches
+        or the last match is a non-outfit item.
+        """
+        if slots is None:
+            slots = OUTFIT_SLOTS
+        text = metadata.get("categories")
+        # Missing categories load from CSV as NaN, so check the type rather than truthiness
+        if isinstance(text, str):
+            segments = [seg.strip() for seg in text.split(">")]
+            if segments and segments[0] == CATEGORY_ROOT:
+                segments = segments[1:]
+            text = " > ".join(seg for seg in segments if seg)
+        if not text or not isinstance(text, str):
+            text = metadata.get("title")
+        if not isinstance(text, str):
+            return None
+
+        best_slot, best_end = None, -1
+        for slot, keywords in list(slots.items()) + [(None, NON_OUTFIT_KEYWORDS)]:
+            end = max((m.end() for m in _slot_pattern(tuple(keywords)).finditer(text)), default=-1)
+            if end > best_end:
+                best_slot, best_end = slot, end
+        return best_slot
+
 
 # Single, shared instance for the running app
 search_service = SemanticSearchService()
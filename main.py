@@ -17,6 +17,8 @@ class QueryRequest(BaseModel):
     query: str
     include_products: bool = False
     top_k: int = 20
+    outfit: bool = False
+    top_k_per_slot: int = 3
 
 
 @app.on_event("startup")
@@ -41,8 +43,12 @@ def recommend(req: QueryRequest):
 
 @app.post("/recommendationChat")
 def recommendationChat(req: QueryRequest):
-    # 1. get the raw semantic hits
-    sem_results = search_service.query(req.query, req.top_k)
+    # 1. get the raw semantic hits, or one diversified set per outfit slot
+    if req.outfit:
+        outfit = search_service.query_outfit(req.query, req.top_k_per_slot)
+        sem_results = [dict(p, slot=slot) for slot, products in outfit.items() for p in products]
+    else:
+        sem_results = search_service.query(req.query, req.top_k)
     # 2. feed them + the original query into the LLM chain
     try:
         chat_response = recommendation_chain.run(req.query, sem_results)
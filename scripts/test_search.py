@@ -14,18 +14,135 @@ This script performs two sanity checks:
    - Validates that the LangChain-based FAISS vectorstore returns a list of product recommendations.
    - Prints L2 distances (lower is more similar) to confirm the semantic search component is functioning.
 
+3. Outfit Tests:
+   - Checks the pure outfit helpers (`mmr_select`, slot assignment) without touching the index.
+   - Runs `query_outfit` against a small in-memory index with stub embeddings and checks slot contents,
+     no repeated products, no padded ids and a single embedding round-trip.
+   - Runs `query_outfit` for a sample query on the real index, prints each slot and compares its latency
+     with a single `query` call.
+
 These tests serve as a quick health check whenever:
 - You regenerate embeddings or rebuild the FAISS index.
 - You update the semantic search logic or pipeline.
 - You want confidence that both the low-level and high-level retrieval components are aligned and operational.
 """
 import pickle
+import time
 import numpy as np
 import faiss
-from llm_processing.semantic_search import search_service
-from llm_processing.recommendation_chain import recommendation_chain
+from langchain_core.embeddings import Embeddings
+from langchain_community.vectorstores import FAISS
+from llm_processing.semantic_search import search_service, mmr_select, SemanticSearchService
 
 # USAGE: pipenv run python -m scripts.test_search
+
+# --- Test outfit helpers ---
+# Pure functions, no index or API calls needed
+print("\n[Outfit Helpers Test]")
+query_vec = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+candidates = np.array([
+    [1.0, 0.0, 0.0],    # best match
+    [0.99, 0.01, 0.0],  # near-duplicate of the best match
+    [0.7, 0.7, 0.0],    # less relevant but different
+], dtype=np.float32)
+assert mmr_select(query_vec, candidates, k=0) == []
+assert mmr_select(query_vec, np.empty((0, 3), dtype=np.float32), k=3) == []
+assert sorted(mmr_select(query_vec, candidates, k=10)) == [0, 1, 2]
+assert mmr_select(query_vec, candidates, k=2, lambda_mult=0.3) == [0, 2], "MMR should skip the near-duplicate"
+assert mmr_select(query_vec, candidates, k=2, lambda_mult=1.0) == [0, 1], "lambda=1 is pure relevance"
+
+# Titles only (categories missing, as with older indexes) -> expected slot
+slot_cases = {
+    "Bootcut Jeans": "bottom",
+    "Flattering Maxi Dress": "top",
+    "Stainless Steel Watch": "accessory",
+    "Short Sleeve Blouse": "top",
+    "Chat That Tote": None,
+    "Wheel Print Tee": "top",
+    "Harvest Festival Sandals": "footwear",
+    "Men's Dress Shoes Oxford": "footwear",
+    "Men's Dress Socks": None,
+    "Women Top Handle Satchel Bag": "accessory",
+    "Slim Fit Dress Pants": "bottom",
+    "Cap Sleeve Blouse": "top",
+    "Cap Toe Oxford Shoes": "footwear",
+}
+for title, expected in slot_cases.items():
+    md = {"title": title, "categories": float("nan")}
+    assert SemanticSearchService._assign_slot(md) == expected, (title, expected)
+
+# Category paths: shared root is stripped, a bare root falls back to the title
+assert SemanticSearchService._assign_slot({"categories": "Shoes", "title": ""}) == "footwear"
+assert SemanticSearchService._assign_slot(
+    {"categories": "Clothing, Shoes & Jewelry", "title": "Beach Sandals"}) == "footwear"
+assert SemanticSearchService._assign_slot(
+    {"categories": "Clothing, Shoes & Jewelry > Women > Clothing > Dresses", "title": ""}) == "top"
+print("Outfit helper checks passed")
+
+# --- Test outfit search on an in-memory index ---
+# Stub embeddings (bag of words over a small vocabulary) so query_outfit runs without OpenAI
+print("\n[Outfit Search Stub Test]")
+
+
+class StubEmbeddings(Embeddings):
+    vocab = ["beach", "summer", "linen", "shirt", "dress", "shoes", "socks", "pants",
+             "shorts", "bag", "hat", "sandals", "top", "bottom", "footwear", "accessory"]
+
+    def __init__(self):
+        self.document_calls = 0
+        self.query_calls = 0
+
+    def _embed(self, text):
+        words = text.lower().split()
+        # Small constant component keeps every vector non-zero
+        return [1.0 if w in words else 0.0 for w in self.vocab] + [0.1]
+
+    def embed_documents(self, texts):
+        self.document_calls += 1
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return self._embed(text)
+
+
+stub_products = [
+    ("p1", "Linen Beach Shirt", float("nan")),
+    ("p1", "Linen Beach Shirt", float("nan")),  # duplicate row for the same product
+    ("p2", "Men's Dress Shoes Oxford", float("nan")),
+    ("p3", "Men's Dress Socks", float("nan")),
+    ("p4", "Slim Fit Dress Pants", float("nan")),
+    ("p5", "Beach Board Shorts", "Clothing, Shoes & Jewelry > Men > Clothing > Shorts"),
+    ("p6", "Women Top Handle Satchel Bag", float("nan")),
+    ("p7", "Straw Beach Hat", "Clothing, Shoes & Jewelry > Women > Accessories > Hats"),
+    ("p8", "Beach Sandals", "Clothing, Shoes & Jewelry > Women > Shoes > Sandals"),
+]
+stub_embeddings = StubEmbeddings()
+stub_service = SemanticSearchService()
+stub_service._embeddings = stub_embeddings
+stub_service._vectorstore = FAISS.from_texts(
+    [title for _, title, _ in stub_products],
+    embedding=stub_embeddings,
+    metadatas=[{"product_id": pid, "title": title, "categories": cats} for pid, title, cats in stub_products],
+)
+stub_embeddings.document_calls = 0
+
+# fetch_k larger than the index forces FAISS to pad results with -1 ids
+stub_outfit = stub_service.query_outfit("beach summer outfit", top_k_per_slot=3, fetch_k=20)
+slot_ids = {slot: {r["product_id"] for r in products} for slot, products in stub_outfit.items()}
+assert slot_ids == {
+    "top": {"p1"},
+    "bottom": {"p4", "p5"},
+    "footwear": {"p2", "p8"},
+    "accessory": {"p6", "p7"},
+}, slot_ids
+all_ids = [r["product_id"] for products in stub_outfit.values() for r in products]
+assert len(all_ids) == len(set(all_ids)), "a product was repeated"
+assert set(all_ids) <= {pid for pid, _, _ in stub_products}, "a padded -1 id leaked into the results"
+# Same round-trips as query(): one embedding call, no per-slot queries
+assert stub_embeddings.document_calls == 1 and stub_embeddings.query_calls == 0
+print("Outfit stub checks passed")
+
 # --- Test raw FAISS index ---
 print("\n[FAISS Vector Store Test]")
 # Load embeddings and FAISS index
@@ -61,6 +178,36 @@ for r in results:
         f"Avg Rating: {r['average_rating']}"
     )
 
+# --- Test outfit composition ---
+print("\n[Outfit Search Test]")
+
+
+def best_of(fn, runs=3):
+    """Best wall-clock time in ms over a few runs, to smooth out embedding API jitter."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+single_ms = best_of(lambda: search_service.query("beach summer outfit", top_k=20))
+outfit_ms = best_of(lambda: search_service.query_outfit("beach summer outfit"))
+outfit = search_service.query_outfit("beach summer outfit")
+
+for slot, products in outfit.items():
+    print(f"{slot}:")
+    for r in products:
+        print(f"  ID: {r['product_id']}, Title: {r['title']}, Score: {r['score']:.4f}")
+print(f"Latency - single query: {single_ms:.1f} ms, outfit query: {outfit_ms:.1f} ms")
+# Both paths make one embedding round-trip and one FAISS search, so they should be on par.
+# Network timing is too noisy for a hard assert; flag anything well past the single query.
+if outfit_ms > 1.5 * single_ms:
+    print(f"WARNING: outfit query is {outfit_ms / single_ms:.1f}x slower than a single query")
+else:
+    print("Outfit latency is on par with a single query")
+
 # Scores BEFORE enriched dataset (only description)
 # [FAISS Test]
 # Top FAISS matches (Normalized all vectors: Higher = better:
@@ -80,6 +227,9 @@ for r in results:
 # ID: B01MS8TRZY, Score: 0.8736
 # ID: B01M1BFCCP, Score: 0.8724
 
+# Imported here because building the chain needs OPENAI_API_KEY, which the stub checks above do not
+from llm_processing.recommendation_chain import recommendation_chain  # noqa: E402
+
 # Fake sample products
 print("LLM Chain Invoked Test:")
 hits = [